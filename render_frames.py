@@ -1,31 +1,53 @@
 """
 Blender render script for spritebake.
-Called internally - renders animation frames to PNG files.
+Called internally - renders animation frames to uncompressed TIFF files.
 """
 
 import bpy
 import sys
 import os
 import math
-from mathutils import Vector
+
+import numpy as np
+
+
+# EEVEE performance overrides. Several were removed or moved in 4.x, so keep
+# only the ones this Blender version has instead of probing with try/except
+# on every render setup.
+_EEVEE_CANDIDATES = [
+    ("use_gtao", False),                # Ambient Occlusion
+    ("use_bloom", False),               # Bloom/glow (removed in 4.x)
+    ("use_ssr", False),                 # Screen Space Reflections (removed in 4.x)
+    ("use_motion_blur", False),         # Motion blur (moved in 4.x)
+    ("use_volumetric_lights", False),   # Volumetrics (removed in 4.x)
+    ("use_volumetric_shadows", False),
+    ("shadow_cube_size", '256'),        # Reduced from 512 (removed in 4.x)
+    ("shadow_cascade_size", '256'),     # (removed in 4.x)
+    ("taa_render_samples", 16),         # Reduced from 64, enough AA without supersampling
+]
+EEVEE_SETTINGS = [(name, value) for name, value in _EEVEE_CANDIDATES
+                  if hasattr(bpy.context.scene.eevee, name)]
+
+# Material names that mark floors/backdrops to neutralize
+BG_KEYWORDS = frozenset(['floor', 'ground', 'background', 'plane', 'bg'])
 
 
 def get_scene_bounds():
     """Calculate bounding box of all visible mesh objects."""
     scene = bpy.context.scene
-    min_co = [float('inf')] * 3
-    max_co = [float('-inf')] * 3
-
-    for obj in scene.objects:
-        if obj.type == 'MESH' and obj.visible_get():
-            for corner in obj.bound_box:
-                world_corner = obj.matrix_world @ Vector(corner)
-                for i in range(3):
-                    min_co[i] = min(min_co[i], world_corner[i])
-                    max_co[i] = max(max_co[i], world_corner[i])
-
-    # If no meshes found, use a default box around origin
-    if min_co[0] == float('inf'):
+    meshes = [obj for obj in scene.objects
+              if obj.type == 'MESH' and obj.visible_get()]
+
+    if meshes:
+        # Transform every object's 8 bound-box corners in one batched matmul
+        corners = np.array([obj.bound_box for obj in meshes], dtype=np.float64)   # (N, 8, 3)
+        mats = np.array([obj.matrix_world for obj in meshes], dtype=np.float64)   # (N, 4, 4)
+        world = np.einsum('nij,nkj->nki', mats[:, :3, :3], corners) + mats[:, None, :3, 3]
+        world = world.reshape(-1, 3)
+        min_co = world.min(axis=0).tolist()
+        max_co = world.max(axis=0).tolist()
+    else:
+        # If no meshes found, use a default box around origin
         min_co = [-1, -1, -1]
         max_co = [1, 1, 1]
 
@@ -73,8 +95,7 @@ def ensure_light(scene_center, scene_size):
     scene = bpy.context.scene
 
     # Check if any lights exist
-    lights = [obj for obj in scene.objects if obj.type == 'LIGHT']
-    if lights:
+    if any(obj.type == 'LIGHT' for obj in scene.objects):
         return False  # Already have lights
 
     # Add a sun light for even illumination
@@ -96,11 +117,13 @@ def get_args():
     argv = sys.argv
     if "--" not in argv:
         return {"output": "/tmp/frames", "frames": 8, "size": 128,
-                "start": None, "end": None, "neutralize_bg": True}
+                "start": None, "end": None, "neutralize_bg": True,
+                "chunk_index": 0, "chunk_count": 1, "render_scale": 1}
 
     argv = argv[argv.index("--") + 1:]
     args = {"output": "/tmp/frames", "frames": 8, "size": 128,
-            "start": None, "end": None, "neutralize_bg": True}
+            "start": None, "end": None, "neutralize_bg": True,
+            "chunk_index": 0, "chunk_count": 1, "render_scale": 1}
 
     i = 0
     while i < len(argv):
@@ -119,6 +142,15 @@ def get_args():
         elif argv[i] == "--end" and i + 1 < len(argv):
             args["end"] = int(argv[i + 1])
             i += 2
+        elif argv[i] == "--render-scale" and i + 1 < len(argv):
+            args["render_scale"] = int(argv[i + 1])
+            i += 2
+        elif argv[i] == "--chunk-index" and i + 1 < len(argv):
+            args["chunk_index"] = int(argv[i + 1])
+            i += 2
+        elif argv[i] == "--chunk-count" and i + 1 < len(argv):
+            args["chunk_count"] = int(argv[i + 1])
+            i += 2
         elif argv[i] == "--no-neutralize-bg":
             args["neutralize_bg"] = False
             i += 1
@@ -128,7 +160,7 @@ def get_args():
     return args
 
 
-def setup_render(size, neutralize_bg=True, render_scale=2):
+def setup_render(size, neutralize_bg=True, render_scale=1):
     """Configure Blender render settings for sprite output."""
     scene = bpy.context.scene
 
@@ -138,57 +170,31 @@ def setup_render(size, neutralize_bg=True, render_scale=2):
     except TypeError:
         scene.render.engine = 'BLENDER_EEVEE'
 
-    # Render at higher resolution, downscale later for cleaner sprites
+    # Render at the final size by default and let EEVEE's TAA samples do the
+    # anti-aliasing; render_scale > 1 supersamples and downscales later
     render_size = size * render_scale
     scene.render.resolution_x = render_size
     scene.render.resolution_y = render_size
-    print(f"[RENDER] Rendering at {render_size}x{render_size}, will downscale to {size}x{size}")
+    if render_scale > 1:
+        print(f"[RENDER] Rendering at {render_size}x{render_size}, will downscale to {size}x{size}")
+    else:
+        print(f"[RENDER] Rendering at {render_size}x{render_size}")
 
     scene.render.resolution_percentage = 100
     scene.render.film_transparent = True
-    scene.render.image_settings.file_format = 'PNG'
+    # Frames are temporary and get re-encoded into the sheet, so write
+    # uncompressed TIFF to skip a deflate/inflate round-trip per frame
+    scene.render.image_settings.file_format = 'TIFF'
+    scene.render.image_settings.tiff_codec = 'NONE'
     scene.render.image_settings.color_mode = 'RGBA'
+    scene.render.image_settings.color_depth = '8'
+    scene.render.use_overwrite = True
+    scene.render.use_placeholder = False
 
-    # EEVEE performance optimizations (with fallbacks for different Blender versions)
+    # EEVEE performance optimizations (filtered for this Blender version at load)
     eevee = scene.eevee
-
-    # Settings that exist in most versions
-    try:
-        eevee.use_gtao = False              # Ambient Occlusion
-    except AttributeError:
-        pass
-    try:
-        eevee.use_bloom = False             # Bloom/glow (removed in 4.x)
-    except AttributeError:
-        pass
-    try:
-        eevee.use_ssr = False               # Screen Space Reflections (removed in 4.x)
-    except AttributeError:
-        pass
-    try:
-        eevee.use_motion_blur = False       # Motion blur (moved in 4.x)
-    except AttributeError:
-        pass
-    try:
-        eevee.use_volumetric_lights = False # Volumetrics (removed in 4.x)
-    except AttributeError:
-        pass
-    try:
-        eevee.use_volumetric_shadows = False
-    except AttributeError:
-        pass
-    try:
-        eevee.shadow_cube_size = '256'      # Reduced from 512 (removed in 4.x)
-    except AttributeError:
-        pass
-    try:
-        eevee.shadow_cascade_size = '256'   # (removed in 4.x)
-    except AttributeError:
-        pass
-    try:
-        eevee.taa_render_samples = 8        # Reduced from 64
-    except AttributeError:
-        pass
+    for name, value in EEVEE_SETTINGS:
+        setattr(eevee, name, value)
 
     if scene.world:
         scene.world.use_nodes = False
@@ -196,9 +202,9 @@ def setup_render(size, neutralize_bg=True, render_scale=2):
 
     # Neutralize background materials to prevent color bleed
     if neutralize_bg:
-        bg_keywords = ['floor', 'ground', 'background', 'plane', 'bg']
         for mat in bpy.data.materials:
-            if any(kw in mat.name.lower() for kw in bg_keywords):
+            name = mat.name.lower()
+            if any(kw in name for kw in BG_KEYWORDS):
                 mat.use_nodes = False
                 mat.diffuse_color = (0, 0, 0, 0)
                 mat.blend_method = 'BLEND'
@@ -208,15 +214,42 @@ def main():
     args = get_args()
     scene = bpy.context.scene
 
-    # Get scene bounds for auto-camera/light positioning
-    center, sizes = get_scene_bounds()
-    max_size = max(sizes[0], sizes[2])
+    frame_start = args["start"] if args["start"] is not None else scene.frame_start
+    frame_end = args["end"] if args["end"] is not None else scene.frame_end
+    num_frames = args["frames"]
 
-    # Create camera if none exists
-    ensure_camera(center, sizes)
+    # Calculate evenly-spaced frames
+    total = frame_end - frame_start + 1
+    if total <= num_frames:
+        frames = list(range(frame_start, frame_end + 1))
+    else:
+        step = total / num_frames
+        frames = [int(frame_start + i * step) for i in range(num_frames)]
 
-    # Create light if none exists
-    ensure_light(center, max_size)
+    # When launched as one of several parallel processes, render only a
+    # contiguous slice of the frame list. Output files are named by scene
+    # frame number so chunks never collide.
+    n = len(frames)
+    chunk_index, chunk_count = args["chunk_index"], args["chunk_count"]
+    first = chunk_index * n // chunk_count
+    last = (chunk_index + 1) * n // chunk_count
+    if first == last:
+        # More processes than frames in the scene range. Bail out before any
+        # scene setup; EEVEE's GPU context is only created on first render.
+        print(f"  Nothing to render in chunk {chunk_index + 1}/{chunk_count}")
+        return
+
+    # Scene bounds are only needed to place an auto camera/light
+    has_light = any(obj.type == 'LIGHT' for obj in scene.objects)
+    if scene.camera is None or not has_light:
+        center, sizes = get_scene_bounds()
+        max_size = max(sizes[0], sizes[2])
+
+        # Create camera if none exists
+        ensure_camera(center, sizes)
+
+        # Create light if none exists
+        ensure_light(center, max_size)
 
     # Try to find and relink missing textures
     blend_dir = os.path.dirname(bpy.data.filepath)
@@ -227,10 +260,6 @@ def main():
         except Exception as e:
             print(f"[TEXTURES] Could not search for missing files: {e}")
 
-    frame_start = args["start"] if args["start"] is not None else scene.frame_start
-    frame_end = args["end"] if args["end"] is not None else scene.frame_end
-    num_frames = args["frames"]
-
     print("spritebake render script")
     print(f"  Output: {args['output']}")
     print(f"  Frame range: {frame_start}-{frame_end}")
@@ -239,27 +268,37 @@ def main():
     print(f"  Camera: {scene.camera.name if scene.camera else 'None'}")
     print(f"  Neutralize BG: {args['neutralize_bg']}")
 
-    # Calculate evenly-spaced frames
-    total = frame_end - frame_start + 1
-    if total <= num_frames:
-        frames = list(range(frame_start, frame_end + 1))
-    else:
-        step = total / num_frames
-        frames = [int(frame_start + i * step) for i in range(num_frames)]
+    if chunk_count > 1:
+        print(f"  Chunk: {chunk_index + 1}/{chunk_count} (frames {first}-{last - 1})")
 
-    print(f"  Rendering: {frames}")
+    print(f"  Rendering: {frames[first:last]}")
 
-    setup_render(args["size"], args["neutralize_bg"])
+    setup_render(args["size"], args["neutralize_bg"], args["render_scale"])
     os.makedirs(args["output"], exist_ok=True)
 
-    for i, frame in enumerate(frames):
-        scene.frame_set(frame)
-        path = os.path.join(args["output"], f"frame_{i:04d}.png")
-        scene.render.filepath = path
-        bpy.ops.render.render(write_still=True)
-        print(f"Rendered {i + 1}/{len(frames)}: {path}")
-
-    print(f"\nDone: {len(frames)} frames")
+    if total <= num_frames:
+        # Every frame in range is wanted: one animation render lets Blender
+        # reuse its per-frame setup, and '####' expands to the frame number
+        def report_frame(scene, *_):
+            i = frames.index(scene.frame_current)
+            print(f"Rendered {i + 1}/{n}: frame {scene.frame_current}")
+
+        scene.frame_start = frames[first]
+        scene.frame_end = frames[last - 1]
+        scene.frame_step = 1
+        scene.render.use_file_extension = True
+        scene.render.filepath = os.path.join(args["output"], "frame_####")
+        bpy.app.handlers.render_write.append(report_frame)
+        bpy.ops.render.render(animation=True)
+    else:
+        for i in range(first, last):
+            scene.frame_set(frames[i])
+            path = os.path.join(args["output"], f"frame_{frames[i]:04d}.tif")
+            scene.render.filepath = path
+            bpy.ops.render.render(write_still=True)
+            print(f"Rendered {i + 1}/{n}: {path}")
+
+    print(f"\nDone: {last - first} frames")
 
 
 if __name__ == "__main__":
@@ -8,14 +8,17 @@ Usage:
 """
 
 import argparse
+import functools
+import re
 import subprocess
 import tempfile
 import shutil
 import sys
 import math
+import threading
 import os
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
 try:
     from PIL import Image
@@ -25,8 +28,20 @@ except ImportError:
     sys.exit(1)
 
 
+# Default number of parallel Blender processes (each holds a GPU context)
+DEFAULT_RENDER_JOBS = 4
+
+
+@functools.lru_cache(maxsize=1)
 def find_blender():
-    """Find Blender executable."""
+    """Find Blender executable.
+
+    $SPRITEBAKE_BLENDER overrides the search.
+    """
+    override = os.environ.get("SPRITEBAKE_BLENDER")
+    if override:
+        return override
+
     locations = [
         "/Applications/Blender.app/Contents/MacOS/Blender",
         "/usr/bin/blender",
@@ -34,14 +49,29 @@ def find_blender():
         "blender",
     ]
     for loc in locations:
-        if Path(loc).exists() or shutil.which(loc):
+        if os.sep in loc:
+            if os.path.isfile(loc):
+                return loc
+        elif shutil.which(loc):
             return loc
     return None
 
 
 def render_frames(blender_path, blend_file, output_dir, frames, size, start, end,
-                  neutralize_bg=True):
-    """Run Blender to render animation frames."""
+                  neutralize_bg=True, jobs=None, supersample=1):
+    """Run Blender to render animation frames.
+
+    The frame list is split across `jobs` Blender processes running in
+    parallel (default: up to 4, capped at the frame count). Every process
+    loads the whole .blend and opens its own EEVEE GPU context, so the
+    default stays small to avoid exhausting VRAM.
+
+    Without both `start` and `end`, the scene's frame range is only known
+    inside Blender, so jobs cannot be capped by it here. A scene shorter
+    than `jobs` frames still starts `jobs` processes; the surplus ones load
+    the .blend, find an empty chunk and exit before any scene setup or GPU
+    work. Pass --jobs (or the frame range) to avoid those loads.
+    """
     script_dir = Path(__file__).parent
     render_script = script_dir / "render_frames.py"
 
@@ -58,29 +88,83 @@ def render_frames(blender_path, blend_file, output_dir, frames, size, start, end
         cmd.extend(["--end", str(end)])
     if not neutralize_bg:
         cmd.append("--no-neutralize-bg")
+    if supersample > 1:
+        cmd.extend(["--render-scale", str(supersample)])
+
+    if jobs is None:
+        jobs = min(DEFAULT_RENDER_JOBS, os.cpu_count() or 1)
+    # Cap by the frames that will actually be rendered when the range is known
+    available = frames
+    if start is not None and end is not None:
+        available = min(frames, end - start + 1)
+    jobs = max(1, min(jobs, available))
+
+    def run_chunk(index):
+        """Run one Blender process, echoing its output as it arrives."""
+        chunk_cmd = cmd + ["--chunk-index", str(index), "--chunk-count", str(jobs)]
+        prefix = f"[{index + 1}/{jobs}] " if jobs > 1 else ""
+
+        proc = subprocess.Popen(chunk_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                text=True, bufsize=1)
+        # Drain stderr on a side thread so a full pipe can't stall Blender
+        stderr_lines = []
+        stderr_reader = threading.Thread(target=lambda: stderr_lines.extend(proc.stderr))
+        stderr_reader.start()
+
+        for line in proc.stdout:
+            line = line.rstrip('\n')
+            if line.strip() and not line.startswith('Fra:') and not line.startswith('Saved:'):
+                print(f"{prefix}{line}", flush=True)
+
+        returncode = proc.wait()
+        stderr_reader.join()
+        if returncode != 0:
+            print(f"Blender error:\n{''.join(stderr_lines)}")
+            return False
+        return True
 
-    print("Running Blender...")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    print(f"Running Blender ({jobs} process{'es' if jobs > 1 else ''})...")
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(run_chunk, range(jobs)))
 
-    if result.returncode != 0:
-        print(f"Blender error:\n{result.stderr}")
-        return False
+    return all(results)
 
-    for line in result.stdout.split('\n'):
-        if line.strip() and not line.startswith('Fra:') and not line.startswith('Saved:'):
-            print(line)
 
-    return True
+def to_rgba_array(img):
+    """Return frame pixels as an (H, W, 4) uint8 array, decoding only if needed."""
+    if isinstance(img, np.ndarray):
+        return img
+    return np.asarray(img.convert('RGBA'))
+
+
+def _color_differs(rgb, color, tolerance=20):
+    """Mask of pixels whose RGB differs from `color` by more than `tolerance` in any channel."""
+    # |rgb - color| without widening out of uint8
+    diff = np.maximum(rgb, color) - np.minimum(rgb, color)
+    return (diff > tolerance).any(axis=2)
 
 
 def is_empty_frame(img, threshold=0.001):
     """Check if frame is empty (solid color or fully transparent)."""
-    arr = np.array(img.convert('RGBA'))
-    total = arr.shape[0] * arr.shape[1]
+    arr = to_rgba_array(img)
+    h, w = arr.shape[:2]
+    total = h * w
     alpha = arr[:, :, 3]
+    rgb = arr[:, :, :3]
+    bg = rgb[0, 0]
+
+    # Fast path: enough opaque pixels that differ from the corner color in
+    # the central quarter alone already rules out both "empty" outcomes
+    center = arr[h // 4:3 * h // 4, w // 4:3 * w // 4]
+    min_count = threshold * total
+    if np.count_nonzero(center[:, :, 3] > 128) > min_count:
+        if np.count_nonzero(_color_differs(center[:, :, :3], bg)) >= min_count:
+            return False
 
-    opaque = np.sum(alpha > 128) / total
-    transparent = np.sum(alpha < 10) / total
+    opaque = np.count_nonzero(alpha > 128) / total
+    # Coarse 50% threshold, so every 4th pixel in each axis is plenty
+    alpha_ds = alpha[::4, ::4]
+    transparent = np.count_nonzero(alpha_ds < 10) / alpha_ds.size
 
     # Silhouette on transparent bg = not empty
     if opaque > threshold and transparent > 0.5:
@@ -90,21 +174,16 @@ def is_empty_frame(img, threshold=0.001):
         return True
 
     # Check RGB variance for solid color frames
-    rgb = arr[:, :, :3]
-    bg = rgb[0, 0]
-    diff = np.abs(rgb.astype(int) - bg.astype(int))
-    diff_ratio = np.sum(np.any(diff > 20, axis=2)) / total
+    diff_ratio = np.count_nonzero(_color_differs(rgb, bg)) / total
 
     return diff_ratio < threshold
 
 
 def is_mostly_transparent(img, threshold=0.80):
     """Check if image is mostly transparent."""
-    arr = np.array(img.convert('RGBA'))
-    alpha = arr[:, :, 3]
-    transparent = np.sum(alpha < 10)
-    total = arr.shape[0] * arr.shape[1]
-    return transparent / total > threshold
+    arr = to_rgba_array(img)
+    alpha_ds = arr[::4, ::4, 3]
+    return np.count_nonzero(alpha_ds < 10) / alpha_ds.size > threshold
 
 
 def needs_background_removal(img):
@@ -116,9 +195,8 @@ def needs_background_removal(img):
     Strategy: Check ALL four corners AND overall transparency.
     Only skip if corners are ALL transparent.
     """
-    arr = np.array(img.convert('RGBA'))
+    arr = to_rgba_array(img)
     alpha = arr[:, :, 3]
-    h, w = alpha.shape
 
     # Check each corner individually (3x3 areas)
     cs = 3  # corner sample size
@@ -135,95 +213,313 @@ def needs_background_removal(img):
             return True  # Needs background removal
 
     # Double-check: overall image should be >40% transparent
-    total_transparent = np.sum(alpha < 10) / (h * w)
+    # (sampled on a 4x decimated grid; the threshold is coarse)
+    alpha_ds = alpha[::4, ::4]
+    total_transparent = np.count_nonzero(alpha_ds < 10) / alpha_ds.size
     if total_transparent < 0.4:
         return True  # Not enough transparency, needs removal
 
     return False  # All corners transparent + good overall transparency
 
 
-def stitch_spritesheet(frames_dir, output_path, cols=None, remove_bg=False, target_size=None):
+def classify_frame(img):
+    """Decode a frame once and return (is_empty, needs_background_removal)."""
+    arr = to_rgba_array(img)
+    if is_empty_frame(arr):
+        return True, False
+    return False, needs_background_removal(arr)
+
+
+# rembg model used by --remove-bg; only U2Net can take the batched path
+DEFAULT_REMBG_MODEL = "u2net"
+
+# Each rembg worker holds its own model copy (~170 MB for U2Net)
+REMBG_MAX_WORKERS = 4
+
+_rembg_session = None
+
+
+def _init_rembg_worker(model, threads):
+    """Load a rembg session once per worker process, limited to `threads` ONNX threads."""
+    global _rembg_session
+    # rembg sizes the ONNX Runtime thread pools from OMP_NUM_THREADS; without
+    # it every worker would spin up a pool as large as the whole machine
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    from rembg import new_session
+    _rembg_session = new_session(model)
+
+
+def _remove_background(arr):
+    """Run rembg on an RGBA array inside a worker process."""
+    from rembg import remove
+    return remove(arr, session=_rembg_session)
+
+
+# U2Net input geometry and normalization, as used by rembg's U2netSession
+U2NET_SIZE = (320, 320)
+U2NET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+U2NET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+REMBG_BATCH_SIZE = 8
+
+
+def supports_batched_removal(session):
+    """Check whether a rembg session is plain U2Net with a dynamic batch dimension."""
+    try:
+        from rembg.sessions.u2net import U2netSession
+    except ImportError:
+        return False
+    if type(session) is not U2netSession:
+        return False
+    batch_dim = session.inner_session.get_inputs()[0].shape[0]
+    return not isinstance(batch_dim, int)
+
+
+def remove_backgrounds_batched(session, arrays):
+    """Cut out a list of same-sized RGBA frames with one U2Net inference call.
+
+    Mirrors rembg's U2netSession.predict + naive cutout, but normalizes the
+    inputs and the predicted masks as whole-batch numpy operations.
+    """
+    h, w = arrays[0].shape[:2]
+
+    # Pre-process: (N, 320, 320, 3) -> per-image max scaling -> (N, 3, 320, 320)
+    batch = np.stack([
+        np.asarray(Image.fromarray(arr).convert('RGB').resize(U2NET_SIZE, Image.LANCZOS))
+        for arr in arrays
+    ]).astype(np.float32)
+    peak = np.maximum(batch.reshape(len(arrays), -1).max(axis=1), 1e-6)
+    batch /= peak[:, None, None, None]
+    batch = (batch - U2NET_MEAN) / U2NET_STD
+    batch = np.ascontiguousarray(batch.transpose(0, 3, 1, 2))
+
+    input_name = session.inner_session.get_inputs()[0].name
+    pred = session.inner_session.run(None, {input_name: batch})[0][:, 0]
+
+    # Post-process: per-image min/max normalization of the masks
+    lo = pred.min(axis=(1, 2), keepdims=True)
+    hi = pred.max(axis=(1, 2), keepdims=True)
+    masks = (((pred - lo) / (hi - lo)).clip(0, 1) * 255).astype(np.uint8)
+
+    results = []
+    for arr, mask in zip(arrays, masks):
+        mask = np.asarray(Image.fromarray(mask).resize((w, h), Image.LANCZOS))
+        # Composite over transparent black, like rembg's naive_cutout
+        cutout = (arr.astype(np.uint16) * mask[:, :, None] + 127) // 255
+        results.append(cutout.astype(np.uint8))
+    return results
+
+
+def remove_backgrounds(frames, indices, model=DEFAULT_REMBG_MODEL):
+    """Replace frames[i] for each i in indices with its background-removed pixels."""
+    done = 0
+
+    def report(count):
+        nonlocal done
+        done += count
+        print(f"\r  Processing: {done}/{len(indices)}", end="", flush=True)
+
+    if model == "u2net":
+        from rembg import new_session
+        session = new_session(model)
+        if supports_batched_removal(session):
+            for start in range(0, len(indices), REMBG_BATCH_SIZE):
+                chunk = indices[start:start + REMBG_BATCH_SIZE]
+                results = remove_backgrounds_batched(session, [frames[i] for i in chunk])
+                for i, result in zip(chunk, results):
+                    frames[i] = result
+                report(len(chunk))
+            print()
+            return
+        # Fixed batch dimension: use the worker pool below
+        del session
+
+    # One frame per call, spread over processes rather than threads since
+    # rembg's pre/post-processing holds the GIL. Frames travel as raw arrays
+    # to keep pickling cheap.
+    cpus = os.cpu_count() or 4
+    num_workers = min(len(indices), REMBG_MAX_WORKERS, cpus)
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_rembg_worker,
+                             initargs=(model, max(1, cpus // num_workers))) as executor:
+        futures = {executor.submit(_remove_background, frames[i]): i
+                   for i in indices}
+        for future in as_completed(futures):
+            frames[futures[future]] = future.result()
+            report(1)
+    print()
+
+
+def downscale_frames(frames, target_size):
+    """Downscale an (N, H, W, 4) frame stack to target_size x target_size.
+
+    Used with --supersample. Integer factors use a per-frame numpy
+    alpha-weighted box filter (an area resample, which suits sprites); other
+    ratios fall back to per-frame LANCZOS on a thread pool, since Pillow
+    releases the GIL while resizing.
+    """
+    n, h, w = frames.shape[:3]
+    factor = h // target_size
+    small = np.empty((n, target_size, target_size, 4), dtype=np.uint8)
+    if h == w and h == factor * target_size:
+        # One frame at a time keeps the float temporaries to a single frame
+        for i, frame in enumerate(frames):
+            blocks = frame.reshape(target_size, factor, target_size, factor, 4).astype(np.float32)
+            alpha = blocks[..., 3:]
+            alpha_sum = alpha.sum(axis=(1, 3))
+            # Weight colors by alpha so transparent pixels don't darken edges
+            rgb = (blocks[..., :3] * alpha).sum(axis=(1, 3)) / np.maximum(alpha_sum, 1)
+            result = np.concatenate([rgb, alpha_sum / (factor * factor)], axis=-1)
+            small[i] = np.rint(result).clip(0, 255)
+        return small
+
+    def resize(frame):
+        return np.asarray(Image.fromarray(frame).resize((target_size, target_size), Image.LANCZOS))
+
+    with ThreadPoolExecutor(max_workers=min(n, os.cpu_count() or 4)) as executor:
+        for i, result in enumerate(executor.map(resize, frames)):
+            small[i] = result
+    return small
+
+
+def png_optimizer_command(path):
+    """Return the command that shrinks a PNG in place, or None if no tool is installed.
+
+    Prefers lossless oxipng; falls back to lossy pngquant.
+    """
+    if shutil.which("oxipng"):
+        return ["oxipng", "-o", "4", "--strip", "all", str(path)]
+    if shutil.which("pngquant"):
+        return ["pngquant", "--quality=50-80", "--ext", ".png", "--force", str(path)]
+    return None
+
+
+FRAME_NAME_RE = re.compile(r"frame_(-?\d+)\.tif")
+
+
+def list_frame_files(frames_dir):
+    """Return the rendered frame files in frames_dir, in frame order."""
+    numbered = []
+    with os.scandir(frames_dir) as entries:
+        for entry in entries:
+            match = FRAME_NAME_RE.fullmatch(entry.name)
+            if match:
+                numbered.append((int(match.group(1)), entry.path))
+    # Files are named by scene frame number, which may be negative or wider
+    # than the zero padding, so sort numerically rather than as strings
+    numbered.sort()
+    return [path for _, path in numbered]
+
+
+def save_frames_as_png(frames_dir, keep_dir):
+    """Save the rendered frames as frame_0000.png, frame_0001.png, ... in keep_dir."""
+    keep_dir = Path(keep_dir)
+    keep_dir.mkdir(parents=True, exist_ok=True)
+    for i, f in enumerate(list_frame_files(frames_dir)):
+        with Image.open(f) as img:
+            img.convert('RGBA').save(keep_dir / f"frame_{i:04d}.png", 'PNG')
+
+
+def stitch_spritesheet(frames_dir, output_path, cols=None, remove_bg=False, target_size=None,
+                       optimize=False, bg_model=DEFAULT_REMBG_MODEL):
     """Combine frames into a sprite sheet."""
-    frames_dir = Path(frames_dir)
-    frame_files = sorted(frames_dir.glob("frame_*.png"))
+    frame_files = list_frame_files(frames_dir)
 
     if not frame_files:
         print("Error: No frames found")
         return False
 
-    images = [Image.open(f) for f in frame_files]
+    # Decode every frame exactly once into one preallocated (N, H, W, 4) buffer
+    with Image.open(frame_files[0]) as first:
+        width, height = first.size
+    frames = np.empty((len(frame_files), height, width, 4), dtype=np.uint8)
+    for i, f in enumerate(frame_files):
+        with Image.open(f) as img:
+            frames[i] = np.asarray(img.convert('RGBA'))
 
     # Downscale if target_size specified and frames are larger
-    if target_size and images[0].width > target_size:
-        print(f"  Downscaling {len(images)} frames from {images[0].width}x{images[0].height} to {target_size}x{target_size}")
-        images = [img.resize((target_size, target_size), Image.LANCZOS) for img in images]
+    if target_size and width > target_size:
+        print(f"  Downscaling {len(frames)} frames from {width}x{height} to {target_size}x{target_size}")
+        frames = downscale_frames(frames, target_size)
 
     if remove_bg:
         try:
-            from rembg import remove, new_session
+            import rembg  # noqa: F401 - fail early if missing
 
             # Auto-detect which frames need background removal
             frames_needing_removal = []
             frames_empty = []
-            for i, img in enumerate(images):
-                if is_empty_frame(img):
+            for i, frame in enumerate(frames):
+                empty, needs_bg = classify_frame(frame)
+                if empty:
                     frames_empty.append(i)
-                elif needs_background_removal(img):
+                elif needs_bg:
                     frames_needing_removal.append(i)
 
             # Replace empty frames with transparent
             for i in frames_empty:
-                images[i] = Image.new('RGBA', images[i].size, (0, 0, 0, 0))
+                frames[i] = 0
 
             if frames_empty:
                 print(f"  {len(frames_empty)} empty frames replaced with transparent")
 
             if frames_needing_removal:
-                print(f"Removing backgrounds ({len(frames_needing_removal)}/{len(images)} frames need processing)...")
-                session = new_session()
-
-                def process_frame(args):
-                    idx, img = args
-                    return idx, remove(img, session=session)
-
-                num_workers = min(len(frames_needing_removal), os.cpu_count() or 4)
-
-                with ThreadPoolExecutor(max_workers=num_workers) as executor:
-                    futures = {executor.submit(process_frame, (i, images[i])): i
-                               for i in frames_needing_removal}
-                    done = 0
-                    for future in as_completed(futures):
-                        idx, result = future.result()
-                        images[idx] = result
-                        done += 1
-                        print(f"\r  Processing: {done}/{len(frames_needing_removal)}", end="", flush=True)
-                    print()
+                print(f"Removing backgrounds ({len(frames_needing_removal)}/{len(frames)} frames need processing)...")
+                remove_backgrounds(frames, frames_needing_removal, model=bg_model)
             else:
                 print("Backgrounds already transparent, skipping rembg")
 
         except ImportError:
             print("Warning: rembg not installed. pip install 'rembg[cpu]'")
 
-    w, h = images[0].width, images[0].height
-    n = len(images)
+    n, h, w = frames.shape[:3]
 
     if cols is None:
         cols = math.ceil(math.sqrt(n))
     rows = math.ceil(n / cols)
 
-    sheet = Image.new('RGBA', (cols * w, rows * h), (0, 0, 0, 0))
+    # The sheet starts fully transparent, so each frame is a plain block copy
+    sheet = np.zeros((rows * h, cols * w, 4), dtype=np.uint8)
 
-    for i, img in enumerate(images):
+    for i, frame in enumerate(frames):
         x = (i % cols) * w
         y = (i // cols) * h
-        sheet.paste(img, (x, y), img)
-
-    sheet.save(output_path, 'PNG')
+        sheet[y:y + h, x:x + w] = frame
+
+    optimizer = png_optimizer_command(output_path) if optimize else None
+    if optimize and optimizer is None:
+        print("Warning: --optimize-output needs oxipng or pngquant on PATH, skipping")
+
+    if optimizer:
+        # The optimizer recompresses the file anyway, so write it fast first
+        Image.fromarray(sheet).save(output_path, 'PNG', compress_level=1)
+        print(f"Optimizing with {optimizer[0]}...")
+        result = subprocess.run(optimizer, capture_output=True, text=True)
+        if result.returncode != 0:
+            # Don't leave the fast-deflate file behind: it is larger than a
+            # normal save (pngquant exits 99 when it can't reach --quality)
+            Image.fromarray(sheet).save(output_path, 'PNG')
+            print(f"Warning: {optimizer[0]} failed, saved without optimization:\n{result.stderr}")
+    else:
+        Image.fromarray(sheet).save(output_path, 'PNG')
     print(f"Saved: {output_path} ({cols * w}x{rows * h})")
 
     return True
 
 
+def frame_staging_dir(frame_bytes, shm="/dev/shm"):
+    """Pick where to stage rendered frames: shared memory if it can hold them.
+
+    Returns None (the default temp dir) when /dev/shm is missing, read-only,
+    or too small, e.g. Docker's 64 MB default.
+    """
+    if not (os.path.isdir(shm) and os.access(shm, os.W_OK)):
+        return None
+    stat = os.statvfs(shm)
+    # Headroom for TIFF headers and anything else using the mount
+    if stat.f_bavail * stat.f_frsize < frame_bytes * 1.25:
+        return None
+    return shm
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Convert Blender animations to sprite sheets",
@@ -237,12 +533,22 @@ def main():
     parser.add_argument("--cols", type=int, help="Grid columns (default: auto)")
     parser.add_argument("--frame-start", type=int, help="Start frame (default: scene start)")
     parser.add_argument("--frame-end", type=int, help="End frame (default: scene end)")
-    parser.add_argument("--keep-frames", action="store_true", help="Save individual frames to {output}_frames/")
+    parser.add_argument("--keep-frames", action="store_true", help="Save individual frames as PNGs to {output}_frames/")
     parser.add_argument("--remove-bg", action="store_true", help="Remove background with AI (requires rembg)")
+    parser.add_argument("--bg-model", default=DEFAULT_REMBG_MODEL,
+                        help=f"rembg model for --remove-bg (default: {DEFAULT_REMBG_MODEL})")
     parser.add_argument("--no-bg-neutralize", action="store_true", help="Keep original background colors")
+    parser.add_argument("--jobs", type=int, help="Parallel Blender processes (default: 4, or CPU count if lower)")
+    parser.add_argument("--supersample", type=int, default=1,
+                        help="Render at N x size and downscale for smoother edges (default: 1)")
+    parser.add_argument("--optimize-output", action="store_true",
+                        help="Shrink the final PNG with oxipng (or lossy pngquant)")
 
     args = parser.parse_args()
 
+    if args.supersample < 1:
+        parser.error("--supersample must be at least 1")
+
     input_path = Path(args.input)
     if not input_path.exists():
         print(f"Error: File not found: {args.input}")
@@ -255,21 +561,27 @@ def main():
 
     print(f"Using Blender: {blender}")
 
-    with tempfile.TemporaryDirectory() as temp_dir:
+    render_size = args.size * args.supersample
+    staging_dir = frame_staging_dir(args.frames * render_size * render_size * 4)
+
+    with tempfile.TemporaryDirectory(dir=staging_dir) as temp_dir:
         frames_dir = Path(temp_dir) / "frames"
         frames_dir.mkdir()
 
         if not render_frames(blender, input_path, frames_dir, args.frames, args.size,
                             args.frame_start, args.frame_end,
-                            neutralize_bg=not args.no_bg_neutralize):
+                            neutralize_bg=not args.no_bg_neutralize, jobs=args.jobs,
+                            supersample=args.supersample):
             sys.exit(1)
 
-        if not stitch_spritesheet(frames_dir, args.output, args.cols, args.remove_bg, target_size=args.size):
+        if not stitch_spritesheet(frames_dir, args.output, args.cols, args.remove_bg, target_size=args.size,
+                                  optimize=args.optimize_output, bg_model=args.bg_model):
             sys.exit(1)
 
         if args.keep_frames:
             keep_dir = Path(args.output).parent / f"{Path(args.output).stem}_frames"
-            shutil.copytree(frames_dir, keep_dir)
+            # Staged frames are uncompressed TIFF; re-encode as frame_NNNN.png in sheet order
+            save_frames_as_png(frames_dir, keep_dir)
             print(f"Frames saved to: {keep_dir}")
 
     print("Done!")
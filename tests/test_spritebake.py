@@ -0,0 +1,122 @@
+"""Tests for spritebake's frame processing helpers."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import spritebake  # noqa: E402
+
+
+def make_frames(n=3, size=64):
+    """Opaque frames with a solid background and a moving colored square."""
+    frames = np.empty((n, size, size, 4), dtype=np.uint8)
+    frames[...] = (200, 200, 200, 255)
+    for i in range(n):
+        frames[i, 16:40, 16 + 4 * i:40 + 4 * i] = (180, 40, 30, 255)
+    return frames
+
+
+def test_batched_removal_matches_rembg_remove():
+    rembg = pytest.importorskip("rembg")
+    try:
+        session = rembg.new_session("u2net")
+    except Exception as e:  # model download needs network access
+        pytest.skip(f"U2Net model unavailable: {e}")
+    if not spritebake.supports_batched_removal(session):
+        pytest.skip("U2Net model has a fixed batch dimension")
+
+    frames = make_frames()
+    batched = spritebake.remove_backgrounds_batched(session, list(frames))
+
+    for frame, result in zip(frames, batched):
+        expected = np.asarray(rembg.remove(frame, session=session))
+        assert result.shape == expected.shape
+        assert np.abs(result.astype(int) - expected.astype(int)).max() <= 1
+
+
+def test_batched_removal_matches_rembg_remove_with_synthetic_u2net():
+    """Same check as above without the model download.
+
+    A one-layer model with U2Net's input/output signature stands in for the
+    real weights, so rembg's own U2netSession pre/post-processing and cutout
+    are exercised against the batched numpy reimplementation.
+    """
+    rembg = pytest.importorskip("rembg")
+    pytest.importorskip("onnx")
+    ort = pytest.importorskip("onnxruntime")
+    from onnx import TensorProto, helper
+    from rembg.sessions.u2net import U2netSession
+
+    weights = np.random.default_rng(0).normal(size=(1, 3, 3, 3)).astype(np.float32)
+    graph = helper.make_graph(
+        [helper.make_node("Conv", ["input.1", "w"], ["d"], pads=[1, 1, 1, 1]),
+         helper.make_node("Sigmoid", ["d"], ["d1"])],
+        "u2net_stub",
+        [helper.make_tensor_value_info("input.1", TensorProto.FLOAT, ["batch", 3, 320, 320])],
+        [helper.make_tensor_value_info("d1", TensorProto.FLOAT, ["batch", 1, 320, 320])],
+        [helper.make_tensor("w", TensorProto.FLOAT, weights.shape, weights.flatten())],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+
+    session = U2netSession.__new__(U2netSession)
+    session.inner_session = ort.InferenceSession(model.SerializeToString(),
+                                                 providers=["CPUExecutionProvider"])
+    assert spritebake.supports_batched_removal(session)
+
+    frames = make_frames()
+    batched = spritebake.remove_backgrounds_batched(session, list(frames))
+
+    for frame, result in zip(frames, batched):
+        expected = np.asarray(rembg.remove(frame, session=session))
+        assert result.shape == expected.shape
+        assert np.abs(result.astype(int) - expected.astype(int)).max() <= 1
+
+
+def test_downscale_integer_factor_is_alpha_weighted_area_average():
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, (2, 8, 8, 4), dtype=np.uint8)
+    frames[1, :2, :2, 3] = 0  # one fully transparent block
+
+    small = spritebake.downscale_frames(frames, 4)
+
+    assert small.shape == (2, 4, 4, 4)
+    block = frames[0, 2:4, 4:6].reshape(-1, 4).astype(np.float64)
+    alpha = block[:, 3]
+    expected_rgb = (block[:, :3] * alpha[:, None]).sum(axis=0) / max(alpha.sum(), 1)
+    assert np.abs(small[0, 1, 2, :3].astype(int) - np.rint(expected_rgb)).max() <= 1
+    assert abs(int(small[0, 1, 2, 3]) - round(alpha.mean())) <= 1
+    assert (small[1, 0, 0] == 0).all()
+
+
+def test_downscale_non_integer_factor_falls_back_to_resize():
+    frames = make_frames(n=2, size=60)
+
+    small = spritebake.downscale_frames(frames, 40)
+
+    assert small.shape == (2, 40, 40, 4)
+    assert small.dtype == np.uint8
+    assert (small[:, :, :, 3] == 255).all()
+
+
+def test_frame_staging_dir_falls_back_when_shm_is_too_small(tmp_path):
+    free = os.statvfs(tmp_path).f_bavail * os.statvfs(tmp_path).f_frsize
+
+    assert spritebake.frame_staging_dir(1024, shm=str(tmp_path)) == str(tmp_path)
+    assert spritebake.frame_staging_dir(free, shm=str(tmp_path)) is None
+    assert spritebake.frame_staging_dir(1024, shm=str(tmp_path / "missing")) is None
+
+
+def test_list_frame_files_sorts_by_frame_number(tmp_path):
+    for name in ["frame_10000.tif", "frame_-002.tif", "frame_9998.tif",
+                 "frame_0000.tif", "frame_-001.tif", "frame_abc.tif", "notes.txt"]:
+        (tmp_path / name).touch()
+
+    names = [os.path.basename(p) for p in spritebake.list_frame_files(tmp_path)]
+
+    assert names == ["frame_-002.tif", "frame_-001.tif", "frame_0000.tif",
+                     "frame_9998.tif", "frame_10000.tif"]